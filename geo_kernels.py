@@ -0,0 +1,90 @@
+"""Haversine kernels for batch CRM validation.
+
+When numba and numpy are installed, haversine_batch compiles to a parallel
+SIMD loop (50-100x faster than pure Python on bulk coordinate arrays).
+Without them everything degrades to plain-Python loops, so the module can
+always be imported.
+"""
+import math
+
+try:
+    import numpy as np
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    np = None
+    numba = None
+    NUMBA_AVAILABLE = False
+
+_DEG2RAD = 0.017453292519943295  # pi / 180
+
+
+def _haversine_scalar_py(lat1, lon1, lat2, lon2):
+    """Distance in km between two points (atan2 Haversine form)."""
+    phi1 = lat1 * _DEG2RAD
+    phi2 = lat2 * _DEG2RAD
+    dphi = (lat2 - lat1) * _DEG2RAD * 0.5
+    dlam = (lon2 - lon1) * _DEG2RAD * 0.5
+    s1 = math.sin(dphi)
+    s2 = math.sin(dlam)
+    a = s1 * s1 + math.cos(phi1) * math.cos(phi2) * s2 * s2
+    return 12742.0 * math.atan2(math.sqrt(a), math.sqrt(1.0 - a))
+
+
+def _haversine_precomputed_py(sphi1, cphi1, lam1, sphi2, cphi2, lam2):
+    """Haversine distance (km) from precomputed sin/cos of the latitudes.
+
+    For N-vs-M nearest-neighbor style comparisons, callers compute
+    sin(phi)/cos(phi) once per point (O(N+M) trig) and this kernel only
+    spends one cosine per pair. Latitudes enter as sin/cos pairs;
+    longitudes (lam1, lam2) are in radians.
+    """
+    # sin^2(x/2) = (1 - cos x)/2 turns the standard formula into
+    # a = (1 - sphi1*sphi2 - cphi1*cphi2*cos(dlam)) / 2
+    a = 0.5 * (1.0 - sphi1 * sphi2 - cphi1 * cphi2 * math.cos(lam2 - lam1))
+    if a < 0.0:
+        a = 0.0  # guard rounding just past the [0, 1] domain
+    elif a > 1.0:
+        a = 1.0
+    return 12742.0 * math.atan2(math.sqrt(a), math.sqrt(1.0 - a))
+
+
+if NUMBA_AVAILABLE:
+    _haversine_scalar = numba.njit(
+        numba.float64(numba.float64, numba.float64, numba.float64, numba.float64),
+        fastmath=True, cache=True, inline="always",
+    )(_haversine_scalar_py)
+
+    haversine_precomputed = numba.njit(
+        numba.float64(numba.float64, numba.float64, numba.float64,
+                      numba.float64, numba.float64, numba.float64),
+        fastmath=True, cache=True,
+    )(_haversine_precomputed_py)
+
+    @numba.njit(fastmath=True, cache=True, parallel=True)
+    def _haversine_batch_jit(lat1, lon1, lat2, lon2, out):
+        for i in numba.prange(lat1.shape[0]):
+            out[i] = _haversine_scalar(lat1[i], lon1[i], lat2[i], lon2[i])
+
+    def haversine_batch(lat1, lon1, lat2, lon2):
+        """Element-wise Haversine distances (km) for equal-length sequences."""
+        # float64 coercion also guards against decimal.Decimal inputs,
+        # which numba cannot type
+        lat1 = np.asarray(lat1, dtype=np.float64)
+        lon1 = np.asarray(lon1, dtype=np.float64)
+        lat2 = np.asarray(lat2, dtype=np.float64)
+        lon2 = np.asarray(lon2, dtype=np.float64)
+        out = np.empty(lat1.shape[0], dtype=np.float64)
+        _haversine_batch_jit(lat1, lon1, lat2, lon2, out)
+        return out
+else:
+    _haversine_scalar = _haversine_scalar_py
+    haversine_precomputed = _haversine_precomputed_py
+
+    def haversine_batch(lat1, lon1, lat2, lon2):
+        """Element-wise Haversine distances (km) for equal-length sequences."""
+        return [
+            _haversine_scalar_py(a, b, c, d)
+            for a, b, c, d in zip(map(float, lat1), map(float, lon1),
+                                  map(float, lat2), map(float, lon2))
+        ]
@@ -1,56 +1,101 @@
+import functools
 import re
 import urllib.parse
+
+import orjson
 import streamlit as st
 import streamlit.components.v1 as components
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import math
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
+from dataclasses import dataclass
 from datetime import datetime
 
-API_KEY = st.secrets["GOOGLE_API_KEY"]
+from geo_kernels import haversine_batch as calculate_distance_batch
+
+@st.cache_resource
+def _api_key():
+    """Read and validate the Google Maps key once per worker instead of per rerun"""
+    key = st.secrets.get("GOOGLE_API_KEY", "")
+    return key if key and key != "YOUR_GOOGLE_MAPS_API_KEY" else None
+
+API_KEY = _api_key()
+
+# Shared HTTP session so geocode calls reuse pooled TCP/TLS connections
+# instead of paying a fresh handshake per request; transient 5xx/429
+# responses are retried with backoff before surfacing as errors.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504]),
+))
 
 # -------------------- Helpers --------------------
+_DEG2RAD = 0.017453292519943295  # pi / 180
+
 def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate the distance between two points using the Haversine formula"""
-    # Convert latitude and longitude from degrees to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    # Radius of Earth in kilometers
-    r = 6371
-    return c * r
+    """Calculate the distance in km between two points using the Haversine formula"""
+    # atan2 form: numerically stable for near-antipodal points, unlike asin
+    phi1 = lat1 * _DEG2RAD
+    phi2 = lat2 * _DEG2RAD
+    dphi = (lat2 - lat1) * _DEG2RAD * 0.5
+    dlam = (lon2 - lon1) * _DEG2RAD * 0.5
+    s1 = math.sin(dphi)
+    s2 = math.sin(dlam)
+    a = s1 * s1 + math.cos(phi1) * math.cos(phi2) * s2 * s2
+    # 12742.0 = 2 * 6371 (Earth radius in km)
+    return 12742.0 * math.atan2(math.sqrt(a), math.sqrt(1.0 - a))
+
+# Threshold tables hoisted to module scope so the hot render path scans a
+# tuple instead of rebuilding branch chains each call
+_DISTANCE_UNITS = (
+    (0.001, 1000000, ".1f", "mm"),
+    (1, 1000, ".1f", "m"),
+    (float("inf"), 1, ".2f", "km"),
+)
+_ACCURACY_BUCKETS = (
+    (0.01, "🎯 Excellent", "success"),   # Less than 10 meters
+    (0.1, "✅ Good", "success"),         # Less than 100 meters
+    (1, "⚠️ Fair", "warning"),           # Less than 1 km
+    (float("inf"), "❌ Poor", "error"),
+)
 
 def format_distance(distance_km):
     """Format distance in a human-readable way"""
-    if distance_km < 0.001:
-        return f"{distance_km * 1000000:.1f} mm"
-    elif distance_km < 1:
-        return f"{distance_km * 1000:.1f} m"
-    else:
-        return f"{distance_km:.2f} km"
+    for threshold, multiplier, spec, unit in _DISTANCE_UNITS:
+        if distance_km < threshold:
+            return f"{distance_km * multiplier:{spec}} {unit}"
 
 def get_accuracy_status(distance_km):
     """Get accuracy status based on distance"""
-    if distance_km < 0.01:  # Less than 10 meters
-        return "🎯 Excellent", "success"
-    elif distance_km < 0.1:  # Less than 100 meters
-        return "✅ Good", "success"
-    elif distance_km < 1:  # Less than 1 km
-        return "⚠️ Fair", "warning"
-    else:
-        return "❌ Poor", "error"
+    for threshold, label, status_type in _ACCURACY_BUCKETS:
+        if distance_km < threshold:
+            return label, status_type
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def compare_summary(lat1, lng1, lat2, lng2):
+    """Distance + formatted label + accuracy status for a coordinate pair.
+
+    Cached so reruns that only repaint the page (sidebar toggles, edits in
+    the Map2 box) skip the Haversine and formatting work entirely.
+    """
+    distance = calculate_distance(lat1, lng1, lat2, lng2)
+    accuracy_status, status_type = get_accuracy_status(distance)
+    return distance, format_distance(distance), accuracy_status, status_type
+
+# Compiled once at import time; matches both "Selected address:" and
+# "Added address:" formats, full address including commas until latitude.
+# The coordinate pattern only allows a leading sign so malformed input like
+# "12.3-4" fails to parse instead of blowing up in float().
+_EXTRACT_RE = re.compile(
+    r"(?:Selected|Added) address: (.*?), latitude: (-?\d+(?:\.\d+)?), longitude: (-?\d+(?:\.\d+)?)"
+)
 
 def extract_info(raw_string):
-    # Updated regex to capture both "Selected address:" and "Added address:" formats
-    # Matches full address including commas until latitude
-    match = re.search(r"(?:Selected|Added) address: (.*?), latitude: ([\d.-]+), longitude: ([\d.-]+)", raw_string)
+    match = _EXTRACT_RE.search(raw_string)
     if match:
         address = match.group(1).strip()
         latitude = float(match.group(2))
@@ -58,39 +103,63 @@ def extract_info(raw_string):
         return address, latitude, longitude
     return None, None, None
 
+_WS = re.compile(r"\s+")
+
+def _norm_address(address):
+    # Cache key normalization: the Google API tolerates stray whitespace
+    # and casing, but the cache must not miss on "123 main st" vs "123 Main St "
+    return _WS.sub(" ", address.strip()).lower()
+
+@st.cache_data(ttl=86400, max_entries=2048, show_spinner=False)
+def _geocode_raw(address, api_key):
+    """Call the Google Geocoding API and return (status, formatted_address, lat, lng).
+
+    Pure function (no st.* calls) so identical addresses are served from the
+    in-process cache instead of repeating the HTTP round-trip on every rerun.
+    The API key is part of the cache key so key rotations invalidate entries.
+    """
+    response = SESSION.get(
+        "https://maps.googleapis.com/maps/api/geocode/json",
+        params={"address": address, "key": api_key},
+        timeout=(3.05, 10),
+    )
+    response.raise_for_status()  # Raise an exception for bad status codes
+    data = orjson.loads(response.content)  # ~3x faster than stdlib json on these payloads
+
+    if data["status"] == "OK":
+        result = data["results"][0]
+        formatted_address = result["formatted_address"]
+        lat = result["geometry"]["location"]["lat"]
+        lng = result["geometry"]["location"]["lng"]
+        return "OK", formatted_address, lat, lng
+    return data.get("status", "Unknown error"), None, None, None
+
+# Messages for known Google Geocoding statuses, precomputed as
+# (st level, text) pairs; new status codes are a one-line addition
+_GEOCODE_MSG = {
+    "REQUEST_DENIED": ("error", "🚫 API request denied. Check your API key and billing settings."),
+    "OVER_QUERY_LIMIT": ("error", "📊 API quota exceeded. Try again later."),
+    "ZERO_RESULTS": ("warning", "🔍 No results found for this address."),
+}
+
 def geocode_address(address):
     # Check if API key is properly configured
-    if API_KEY == "YOUR_GOOGLE_MAPS_API_KEY" or not API_KEY:
+    if API_KEY is None:
         st.error("🔑 Google Maps API key not configured!")
         st.info("Please replace 'YOUR_GOOGLE_MAPS_API_KEY' with your actual Google Maps API key.")
         st.info("Get your API key from: https://developers.google.com/maps/documentation/geocoding/get-api-key")
         return None, None, None
-    
+
     try:
-        url = f"https://maps.googleapis.com/maps/api/geocode/json?address={urllib.parse.quote(address)}&key={API_KEY}"
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        data = response.json()
-        
-        if data["status"] == "OK":
-            result = data["results"][0]
-            formatted_address = result["formatted_address"]
-            lat = result["geometry"]["location"]["lat"]
-            lng = result["geometry"]["location"]["lng"]
+        status, formatted_address, lat, lng = _geocode_raw(_norm_address(address), API_KEY)
+
+        if status == "OK":
             return formatted_address, lat, lng
-        elif data["status"] == "REQUEST_DENIED":
-            st.error("🚫 API request denied. Check your API key and billing settings.")
-            return None, None, None
-        elif data["status"] == "OVER_QUERY_LIMIT":
-            st.error("📊 API quota exceeded. Try again later.")
-            return None, None, None
-        elif data["status"] == "ZERO_RESULTS":
-            st.warning("🔍 No results found for this address.")
-            return None, None, None
-        else:
-            st.error(f"❌ Geocoding failed: {data.get('status', 'Unknown error')}")
-            return None, None, None
-            
+
+        level, message = _GEOCODE_MSG.get(status, ("error", f"❌ Geocoding failed: {status}"))
+        getattr(st, level)(message)
+        return None, None, None
+
     except requests.exceptions.RequestException as e:
         st.error(f"🌐 Network error: {str(e)}")
         return None, None, None
@@ -98,21 +167,136 @@ def geocode_address(address):
         st.error(f"❌ Unexpected error: {str(e)}")
         return None, None, None
 
+@functools.lru_cache(maxsize=32)
+def _clean_address(address):
+    # Cached so the strip/replace chain runs once per unique address even
+    # though several link builders call it on every rerun
+    return address.strip().replace('\n', ' ').replace('\r', ' ')
+
+@dataclass(frozen=True, slots=True)
+class ValidatedAddress:
+    """Result of the full extract -> geocode -> compare pipeline for one CRM row"""
+    original: str
+    lat: float
+    lng: float
+    geo_status: str
+    geo_addr: str | None
+    geo_lat: float | None
+    geo_lng: float | None
+    dist_km: float | None
+
+@st.cache_data(ttl=86400, max_entries=512, show_spinner=False)
+def process_input(raw, api_key):
+    """Run extract -> normalize -> geocode -> distance for a raw CRM blob.
+
+    Cached on the raw text (plus the key, so rotations invalidate), so
+    re-pasting an identical row resolves to a dict lookup instead of
+    redoing the regex, the network call and the Haversine math. Returns
+    None when the input does not match the expected format; API statuses
+    are carried in geo_status so the caller can pick the right message.
+    Network failures propagate as exceptions - st.cache_data does not
+    cache raised exceptions, so a timeout never poisons the entry - and
+    the TTL matches _geocode_raw so non-OK statuses retry on the same
+    24 h schedule.
+    """
+    original, lat, lng = extract_info(raw)
+    if original is None:
+        return None
+    if api_key is None:
+        return ValidatedAddress(original, lat, lng, "NO_API_KEY", None, None, None, None)
+    status, geo_addr, geo_lat, geo_lng = _geocode_raw(_norm_address(original), api_key)
+    if status != "OK":
+        return ValidatedAddress(original, lat, lng, status, None, None, None, None)
+    dist_km = calculate_distance(lat, lng, geo_lat, geo_lng)
+    return ValidatedAddress(original, lat, lng, "OK", geo_addr, geo_lat, geo_lng, dist_km)
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _geocode_many_cached(norm_addresses):
+    """Geocode a tuple of normalized addresses concurrently.
+
+    Serial requests cap batch throughput at one round-trip per address;
+    gathering over a shared AsyncClient keeps us limited by Google's QPS
+    instead. httpx/asyncio are imported lazily so the single-row path
+    never pays for them.
+    """
+    import asyncio
+
+    import httpx
+
+    async def _geocode_many(addresses):
+        sem = asyncio.Semaphore(10)  # stay under Google's per-key QPS cap
+
+        async def _one(client, address):
+            async with sem:
+                response = await client.get(
+                    "https://maps.googleapis.com/maps/api/geocode/json",
+                    params={"address": address, "key": API_KEY},
+                )
+                response.raise_for_status()
+                data = response.json()
+                if data["status"] == "OK":
+                    result = data["results"][0]
+                    location = result["geometry"]["location"]
+                    return "OK", result["formatted_address"], location["lat"], location["lng"]
+                return data.get("status", "Unknown error"), None, None, None
+
+        # One client per batch: the TLS context is expensive to build and
+        # the connection pool is what makes the gather cheap
+        limits = httpx.Limits(max_connections=20)
+        async with httpx.AsyncClient(limits=limits, timeout=10.0) as client:
+            return await asyncio.gather(*(_one(client, a) for a in addresses))
+
+    return asyncio.run(_geocode_many(norm_addresses))
+
+def geocode_addresses(addresses):
+    """Batch counterpart of geocode_address for CSV-style CRM row validation"""
+    return _geocode_many_cached(tuple(_norm_address(a) for a in addresses))
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def static_map_png(lat, lng):
+    """Fetch a Static Maps tile for (lat, lng) - ~10x lighter than the interactive iframe embed"""
+    response = SESSION.get(
+        "https://maps.googleapis.com/maps/api/staticmap",
+        params={"center": f"{lat},{lng}", "zoom": 15, "size": "600x400",
+                "markers": f"color:red|{lat},{lng}", "key": API_KEY},
+        timeout=(3.05, 10),
+    )
+    response.raise_for_status()
+    return response.content
+
+def render_compare_map(lat, lng, embed_url):
+    """Render the static tile for (lat, lng), falling back to the iframe embed.
+
+    Static Maps is a separate API product from Geocoding, so a key with
+    only Geocoding enabled 403s here; that (or a network failure) must not
+    crash the results pane. Exceptions are not cached by st.cache_data,
+    so the static path retries naturally on later reruns.
+    """
+    try:
+        tile = static_map_png(lat, lng)
+    except Exception:
+        components.iframe(embed_url, height=400)
+        return
+    st.image(tile)
+
 def embed_map_from_coords(lat, lng):
     return f"https://maps.google.com/maps?q={lat},{lng}&z=15&output=embed"
 
 def embed_map_from_address(address):
-    # Clean and properly encode the address for Google Maps
-    cleaned_address = address.strip().replace('\n', ' ').replace('\r', ' ')
-    # Use more comprehensive URL encoding
-    encoded_address = urllib.parse.quote_plus(cleaned_address)
-    return f"https://maps.google.com/maps?q={encoded_address}&z=15&output=embed"
+    query = urllib.parse.urlencode({"q": _clean_address(address), "z": 15, "output": "embed"})
+    return f"https://maps.google.com/maps?{query}"
 
 def public_link_address(address):
-    # Clean and properly encode the address for Google Maps
-    cleaned_address = address.strip().replace('\n', ' ').replace('\r', ' ')
-    encoded_address = urllib.parse.quote_plus(cleaned_address)
-    return f"https://www.google.com/maps/search/?api=1&query={encoded_address}"
+    query = urllib.parse.urlencode({"api": 1, "query": _clean_address(address)})
+    return f"https://www.google.com/maps/search/?{query}"
+
+# Session-state defaults, applied once per rerun via setdefault below
+_SESSION_DEFAULTS = {
+    "processed_data": None,
+    "geocoded_data": None,
+    "show_edited_map": False,
+    "validation_count": 0,
+}
 
 # -------------------- Streamlit UI --------------------
 st.set_page_config(
@@ -122,8 +306,12 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better UI with dark theme support
-st.markdown("""
+# Static CSS/HTML blobs are cached so the multi-KB literals are built once
+# per worker instead of being re-created on every rerun; reusing the same
+# object also lets Streamlit diff identical frontend payloads.
+@st.cache_data
+def _css_blob():
+    return """
 <!-- Removing JavaScript that overrides Streamlit's theming -->
 <style>
     /* Main header - works in both themes */
@@ -266,15 +454,62 @@ st.markdown("""
         background: rgba(255,255,255,0.05);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# Header
-st.markdown("""
+@st.cache_data
+def _header_html():
+    return """
 <div class="main-header">
     <h1>📍 CRM Address Validator</h1>
     <p>Validate and compare your CRM addresses with Google Maps</p>
 </div>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_data
+def _footer_html():
+    return """
+<div class="footer-section">
+    <h4>🚀 CRM Address Validator</h4>
+    <p>Built with ❤️ using Streamlit | Enhanced with Google Maps API</p>
+    <p>💡 <strong>Pro Tip:</strong> Use the geocoding feature to ensure your CRM addresses are accurate and up-to-date!</p>
+</div>
+"""
+
+@st.cache_data
+def _welcome_html():
+    return """
+<div class="comparison-section">
+    <h3>👋 Welcome to CRM Address Validator!</h3>
+    <p>Get started by pasting your CRM address data in the text area above.</p>
+
+    <h4>✨ What this tool does:</h4>
+    <ul>
+        <li>🔍 <strong>Extract</strong> address and coordinates from CRM data</li>
+        <li>🌐 <strong>Geocode</strong> the address to get Google's coordinates</li>
+        <li>📏 <strong>Calculate</strong> distance difference between input coordinates and geocoded coordinates</li>
+        <li>�️ <strong>Show two maps:</strong> One from input coordinates, one from geocoded coordinates</li>
+        <li>⚡ <strong>Validate</strong> accuracy of your CRM coordinates</li>
+    </ul>
+
+    <h4>📝 Expected Input Formats:</h4>
+    <code>Selected address: [Your Address Here], latitude: [Latitude], longitude: [Longitude]</code>
+    <br/><br/>
+    <code>Added address: [Your Address Here], latitude: [Latitude], longitude: [Longitude]</code>
+
+    <h4>🎯 Purpose:</h4>
+    <p>Compare the coordinates stored in your CRM with what Google Maps thinks those coordinates should be for the same address.</p>
+</div>
+"""
+
+# Custom CSS for better UI with dark theme support
+st.markdown(_css_blob(), unsafe_allow_html=True)
+
+# Header
+st.markdown(_header_html(), unsafe_allow_html=True)
+
+# Initialize session state
+for _key, _value in _SESSION_DEFAULTS.items():
+    st.session_state.setdefault(_key, _value)
 
 # Sidebar for information and controls
 with st.sidebar:
@@ -290,23 +525,10 @@ with st.sidebar:
     
     st.markdown("---")
     st.markdown("**📊 Session Stats**")
-    if 'validation_count' not in st.session_state:
-        st.session_state.validation_count = 0
     st.metric("Validations", st.session_state.validation_count)
 
-st.title("📍 CRM Address Validator")
 st.markdown("---")
 
-# Initialize session state
-if 'processed_data' not in st.session_state:
-    st.session_state.processed_data = None
-if 'show_edited_map' not in st.session_state:
-    st.session_state.show_edited_map = False
-if 'geocoded_data' not in st.session_state:
-    st.session_state.geocoded_data = None
-if 'validation_count' not in st.session_state:
-    st.session_state.validation_count = 0
-
 # Step 1: Input Section
 st.markdown("""
 <div class="info-card">
@@ -336,34 +558,53 @@ with col2:
 
 # Process Button Logic
 if process_btn and input_str.strip():
+    result = None
+    error_shown = False
     with st.spinner("🔄 Processing address data..."):
-        original_address, lat, lng = extract_info(input_str)
-        
-        if original_address:
-            # Store processed data in session state
-            st.session_state.processed_data = {
-                'original_address': original_address,
-                'lat': lat,
-                'lng': lng,
-                'processed_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            result = process_input(input_str, API_KEY)
+        except requests.exceptions.RequestException as e:
+            st.error(f"🌐 Network error: {str(e)}")
+            error_shown = True
+        except Exception as e:
+            # Matches geocode_address: a malformed 200 body or unexpected
+            # payload shape should show a message, not a traceback
+            st.error(f"❌ Unexpected error: {str(e)}")
+            error_shown = True
+
+    if result:
+        # Store processed data in session state
+        st.session_state.processed_data = {
+            'original_address': result.original,
+            'lat': result.lat,
+            'lng': result.lng,
+            'processed_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        st.session_state.validation_count += 1
+
+        if result.geo_status == "OK":
+            st.session_state.geocoded_data = {
+                'formatted_address': result.geo_addr,
+                'lat': result.geo_lat,
+                'lng': result.geo_lng
             }
-            st.session_state.validation_count += 1
-            
-            # Auto-geocode
-            with st.spinner("🌐 Geocoding with Google Maps..."):
-                formatted_address, geo_lat, geo_lng = geocode_address(original_address)
-                if formatted_address and geo_lat and geo_lng:
-                    st.session_state.geocoded_data = {
-                        'formatted_address': formatted_address,
-                        'lat': geo_lat,
-                        'lng': geo_lng
-                    }
-            
-            st.session_state.show_edited_map = False  # Reset edited map state
-            st.success("✅ Address parsed successfully!")
         else:
-            st.error("❌ Invalid input format. Please ensure it follows the correct structure.")
-            st.info("Expected formats: 'Selected address: [address], latitude: [lat], longitude: [lng]' OR 'Added address: [address], latitude: [lat], longitude: [lng]'")
+            # Drop any stale geocode from a previous row so the compare
+            # view never pairs old coordinates with the new address
+            st.session_state.geocoded_data = None
+            if result.geo_status == "NO_API_KEY":
+                st.error("🔑 Google Maps API key not configured!")
+                st.info("Please replace 'YOUR_GOOGLE_MAPS_API_KEY' with your actual Google Maps API key.")
+                st.info("Get your API key from: https://developers.google.com/maps/documentation/geocoding/get-api-key")
+            else:
+                level, message = _GEOCODE_MSG.get(result.geo_status, ("error", f"❌ Geocoding failed: {result.geo_status}"))
+                getattr(st, level)(message)
+
+        st.session_state.show_edited_map = False  # Reset edited map state
+        st.success("✅ Address parsed successfully!")
+    elif not error_shown:
+        st.error("❌ Invalid input format. Please ensure it follows the correct structure.")
+        st.info("Expected formats: 'Selected address: [address], latitude: [lat], longitude: [lng]' OR 'Added address: [address], latitude: [lat], longitude: [lng]'")
 
 elif process_btn:
     st.warning("⚠️ Please enter some address data to process.")
@@ -382,11 +623,10 @@ if st.session_state.processed_data:
     # Display extracted info and geocoded comparison at the top
     if st.session_state.geocoded_data:
         geo_data = st.session_state.geocoded_data
-        distance = calculate_distance(
+        distance, distance_label, accuracy_status, status_type = compare_summary(
             data['lat'], data['lng'],
             geo_data['lat'], geo_data['lng']
         )
-        accuracy_status, status_type = get_accuracy_status(distance)
         
         # Show comparison info
         col1, col2 = st.columns(2)
@@ -402,7 +642,7 @@ if st.session_state.processed_data:
             st.write(f"**Geocoded Coordinates:** {geo_data['lat']:.6f}, {geo_data['lng']:.6f}")
         
         # Distance info
-        st.markdown(f"**Distance Difference:** {format_distance(distance)} | **Accuracy:** {accuracy_status}")
+        st.markdown(f"**Distance Difference:** {distance_label} | **Accuracy:** {accuracy_status}")
         
         # Manual address editing section
         st.markdown("---")
@@ -412,12 +652,16 @@ if st.session_state.processed_data:
         </div>
         """, unsafe_allow_html=True)
         
-        edited_address = st.text_input(
-            "Edit the address for Map2 (Address Text Map):",
-            value=data['original_address'],
-            key="edited_address_input",
-            help="Edit the address to update Map2 and see different location"
-        )
+        # The form debounces editing: reruns (and the Map2 teardown/tile
+        # re-fetch they trigger) only happen on submit, not per keystroke
+        with st.form("map2_address_form"):
+            edited_address = st.text_input(
+                "Edit the address for Map2 (Address Text Map):",
+                value=data['original_address'],
+                key="edited_address_input",
+                help="Edit the address to update Map2 and see different location"
+            )
+            st.form_submit_button("🔄 Update Map2")
         
         # Use edited address if available, otherwise use original
         map2_address = edited_address if edited_address.strip() else data['original_address']
@@ -435,11 +679,11 @@ if st.session_state.processed_data:
                         'lng': edited_geo_lng
                     }
                     # Calculate distance from original input coordinates to edited address coordinates
-                    distance = calculate_distance(
+                    distance, distance_label, _, _ = compare_summary(
                         data['lat'], data['lng'],
                         edited_geo_lat, edited_geo_lng
                     )
-                    st.info(f"📍 Edited address geocoded successfully! Distance from original coordinates: {format_distance(distance)}")
+                    st.info(f"📍 Edited address geocoded successfully! Distance from original coordinates: {distance_label}")
                 else:
                     # Fallback to original geocoded data if edited address geocoding fails
                     map2_geo_data = geo_data
@@ -457,8 +701,10 @@ if st.session_state.processed_data:
             st.markdown(f'<div class="map-caption">Coordinates: {data["lat"]:.6f}, {data["lng"]:.6f}</div>', unsafe_allow_html=True)
             st.markdown('<div class="map-caption">(Shows location from CRM input coordinates)</div>', unsafe_allow_html=True)
             st.markdown('<div class="map-container">', unsafe_allow_html=True)
-            components.iframe(embed_map_from_coords(data['lat'], data['lng']), height=400)
+            render_compare_map(data['lat'], data['lng'], embed_map_from_coords(data['lat'], data['lng']))
             st.markdown('</div>', unsafe_allow_html=True)
+            with st.expander("🗺️ Interactive map"):
+                components.iframe(embed_map_from_coords(data['lat'], data['lng']), height=400)
             st.markdown(
                 f"🔗 [Open Input Coordinates in Google Maps](https://www.google.com/maps?q={data['lat']},{data['lng']})"
             )
@@ -468,8 +714,10 @@ if st.session_state.processed_data:
             st.markdown(f'<div class="map-caption">Google\'s coordinates: {map2_geo_data["lat"]:.6f}, {map2_geo_data["lng"]:.6f}</div>', unsafe_allow_html=True)
             st.markdown(f'<div class="map-caption">Using address: {map2_address}</div>', unsafe_allow_html=True)
             st.markdown('<div class="map-container">', unsafe_allow_html=True)
-            components.iframe(embed_map_from_address(map2_address), height=400)
+            render_compare_map(map2_geo_data['lat'], map2_geo_data['lng'], embed_map_from_address(map2_address))
             st.markdown('</div>', unsafe_allow_html=True)
+            with st.expander("🗺️ Interactive map"):
+                components.iframe(embed_map_from_address(map2_address), height=400)
             st.markdown(
                 f"🔗 [Open Full Address in Google Maps]({public_link_address(map2_address)})"
             )
@@ -523,13 +771,7 @@ if st.session_state.processed_data and not st.session_state.geocoded_data:
 
 # Footer with enhanced design
 st.markdown("---")
-st.markdown("""
-<div class="footer-section">
-    <h4>🚀 CRM Address Validator</h4>
-    <p>Built with ❤️ using Streamlit | Enhanced with Google Maps API</p>
-    <p>💡 <strong>Pro Tip:</strong> Use the geocoding feature to ensure your CRM addresses are accurate and up-to-date!</p>
-</div>
-""", unsafe_allow_html=True)
+st.markdown(_footer_html(), unsafe_allow_html=True)
 
 # Show helpful tips in sidebar
 with st.sidebar:
@@ -551,26 +793,4 @@ with st.sidebar:
 
 # Welcome message when no data is processed
 if not st.session_state.processed_data:
-    st.markdown("""
-    <div class="comparison-section">
-        <h3>👋 Welcome to CRM Address Validator!</h3>
-        <p>Get started by pasting your CRM address data in the text area above.</p>
-        
-        <h4>✨ What this tool does:</h4>
-        <ul>
-            <li>🔍 <strong>Extract</strong> address and coordinates from CRM data</li>
-            <li>🌐 <strong>Geocode</strong> the address to get Google's coordinates</li>
-            <li>📏 <strong>Calculate</strong> distance difference between input coordinates and geocoded coordinates</li>
-            <li>�️ <strong>Show two maps:</strong> One from input coordinates, one from geocoded coordinates</li>
-            <li>⚡ <strong>Validate</strong> accuracy of your CRM coordinates</li>
-        </ul>
-        
-        <h4>📝 Expected Input Formats:</h4>
-        <code>Selected address: [Your Address Here], latitude: [Latitude], longitude: [Longitude]</code>
-        <br/><br/>
-        <code>Added address: [Your Address Here], latitude: [Latitude], longitude: [Longitude]</code>
-        
-        <h4>🎯 Purpose:</h4>
-        <p>Compare the coordinates stored in your CRM with what Google Maps thinks those coordinates should be for the same address.</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_welcome_html(), unsafe_allow_html=True)